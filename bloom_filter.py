@@ -28,24 +28,25 @@ class BloomFilter(object):
         """
         Add an item in the filter
         """
-        digests = []
+        # bind attributes to locals, so the loop doesn't look them up on every hash
+        bit_array, size, mmh3_hash = self.bit_array, self.size, mmh3.hash
         for i in range(self.hash_count):
             # create digest for given item
             # i work as seed to mmh3.hash() function
             # with different seed, digest created is different
-            digest = mmh3.hash(item, i) % self.size
-            #digests.append(digest)
+            digest = mmh3_hash(item, i) % size
 
             # set the bit True in bit_array
-            self.bit_array[digest] = True
+            bit_array[digest] = True
     
     def check(self, item):
         """
         Checks for existence of an item in the filter
         """
+        bit_array, size, mmh3_hash = self.bit_array, self.size, mmh3.hash
         for i in range(self.hash_count):
-            digest = mmh3.hash(item, i) % self.size
-            if self.bit_array[digest] == False:
+            digest = mmh3_hash(item, i) % size
+            if not bit_array[digest]:
                 # if any of the bit is False, then its not present in the filter
                 # else there is probability that it exist
                 return False
@@ -11,16 +11,22 @@ parser.add_argument("-wl", "--wordlist", dest="wordlist_file",
                     help="Name or absolute Path to wordlist file", required=False)
 parser.add_argument("-fp","--false_pos_prob", type=float, dest="false_pos_prob",
                     help="False positive probability", required=False)
+parser.add_argument("-enc", "--encoding", dest="encoding",
+                    help="Encoding of the wordlist file (default: UTF-8, or latin-1 when not valid UTF-8)",
+                    required=False)
 
 args = parser.parse_args()
 
 wordlist_file = args.wordlist_file
 false_pos_prob = args.false_pos_prob
+encoding = args.encoding
 try:
-    spell_chk = SpellChecker(wordlist_file=wordlist_file, fp_prob=false_pos_prob)
+    spell_chk = SpellChecker(wordlist_file=wordlist_file, fp_prob=false_pos_prob, encoding=encoding)
     spell_chk.start_sc()
 except FileNotFoundError:
     print(f"Error: could not find file '{wordlist_file}'. Please check the filename or path and try again")
+except (LookupError, UnicodeDecodeError):
+    print(f"Error: could not decode file '{wordlist_file}' as '{encoding}'. Please check the encoding and try again")
 except ValueError:
     print(f"Error: The false positive probability should be a decimal number between 0 and 1.")
     print(f"Example usage: python main.py -wl wordlist.txt -fp 0.05")
\ No newline at end of file
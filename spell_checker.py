@@ -1,9 +1,52 @@
+import functools
+import os
+import sys
+from itertools import repeat
 from spell_checker_bf import BloomFilter
-from typing import List
+from typing import List, Optional
+
+
+@functools.lru_cache(maxsize=8)
+def _build_filter(wordlist_file: str, wordlist_mtime: float, fp_prob: float, encoding: Optional[str]) -> BloomFilter:
+    """
+    Loads (or creates) the Bloom Filter of a word list file, once per process for each
+    (`wordlist_file`, `wordlist_mtime`, `fp_prob`, `encoding`), so instances of SpellChecker with the same
+    arguments share it while the word list file is not modified
+
+    The built Bloom Filter is saved next to the word list file (`<wordlist_file>.<encoding>.<fp_prob>.bf.npy`,
+    with "auto" as `<encoding>` when it is not given)
+    and reused by the next processes while the word list file is not modified
+
+    The returned Bloom Filter is shared by all those SpellChecker instances, so it is always read-only
+    (whether it was loaded memory-mapped or just built). Entries of older modification times keep
+    their filters (and memory-mapped files, which `BloomFilter.save` replaces atomically) alive
+    until they are evicted from the cache
+
+    Parameters:
+    wordlist_file (str): Canonical path (see `os.path.realpath`) of the file to be loaded as word list
+    wordlist_mtime (float): Last modification time of `wordlist_file`
+    fp_prob (float): False positive probability to be used
+    encoding (Optional[str]): Encoding of `wordlist_file`, or None to detect it (see `SpellChecker._create_word_list`)
+
+    Returns:
+    BloomFilter: An instance of BloomFilter class loaded with the word list
+    """
+    cache_file = f"{wordlist_file}.{encoding or 'auto'}.{fp_prob}.bf.npy"
+    bloom_filter = SpellChecker._load_cached_bloom_filter(wordlist_mtime, cache_file)
+    if bloom_filter is None:
+        bloom_filter = SpellChecker._create_bloom_filter_with_wordlist(
+            SpellChecker._create_word_list(wordlist_file, encoding), fp_prob)
+        bloom_filter.blocks.flags.writeable = False
+        try:
+            bloom_filter.save(cache_file)
+        except OSError:
+            # Caching is only an optimization: the Bloom Filter is just rebuilt next time
+            pass
+    return bloom_filter
 
 
 class SpellChecker():
-    def __init__(self, wordlist_file: str = "wordlist.txt", fp_prob: float = 0.05) -> None:
+    def __init__(self, wordlist_file: str = "wordlist.txt", fp_prob: float = 0.05, encoding: Optional[str] = None) -> None:
         """
         Initializes an instance of a SpellChecker which checks the probably existence of a word
         in a word list loaded from a file
@@ -19,15 +62,30 @@ class SpellChecker():
         wordlist_file (str): Name or the absolute path of the file to be opened and loaded as word list
         fp_prob (float): False positive probability to be used - The lesser the number, the lesser false positives. 
             However, the program will use more memory        
+        encoding (Optional[str]): Encoding of the word list file. When not given, the file is decoded as UTF-8,
+            falling back to latin-1 (ISO-8859-1, the encoding of the bundled `wordlist.txt`) when it is not valid UTF-8
+
+        The built Bloom Filter is shared by the instances with the same arguments, wherever `wordlist_file`
+        is referred from (relative path, absolute path or symbolic link, see `_build_filter`),
+        and saved next to the word list file (`<wordlist_file>.<encoding>.<fp_prob>.bf.npy`) to be reused
+        by the next runs, while the word list file is not modified
         """
-        self._bloom_filter = self._create_bloom_filter_with_wordlist(
-            self._create_word_list(wordlist_file), fp_prob)
+        wordlist_file = os.path.realpath(wordlist_file)
+        self._bloom_filter = _build_filter(
+            wordlist_file, os.path.getmtime(wordlist_file), fp_prob, encoding)
 
     def start_sc(self):
         """
         Starts this Spell Checker previously configured in the terminal console.
         It will ask for a word to check its probably existence in the loaded word list.
+
+        When the standard input is not a terminal (e.g. `cat words.txt | python main.py`),
+        all its lines are checked at once and one result is written per non-blank line instead
         """
+        if not sys.stdin.isatty():
+            self._check_stdin()
+            return
+
         while True:
             try:
                 word_to_check = input(
@@ -59,19 +117,74 @@ class SpellChecker():
         """
         return self._bloom_filter.check(word)
 
+    def check_many(self, words: List[str]) -> List[bool]:
+        """
+        Checks whether each one of the `words` probably exists in the loaded word list, at once.
+
+        Parameters:
+        words (List[str]): List of words to be checked
+
+        Return:
+        List[bool]: For each word, True if probably exists, or False when definitely doesn't exist
+        """
+        return self._bloom_filter.check_many(words).tolist()
+
+    def _check_stdin(self):
+        """
+        Checks all the non-blank lines of the standard input in a single batch
+        and writes the result of each one to the standard output
+        """
+        words = [w for w in sys.stdin.read().splitlines() if w.strip()]
+        results = self.check_many(words)
+        sys.stdout.write("".join(
+            f"The word '{w}' probably exist in the dictionary!\n" if found else
+            f"The word '{w}' probably DOES NOT exist in the dictionary!\n"
+            for w, found in zip(words, results)))
+
+    @classmethod
+    def _load_cached_bloom_filter(cls, wordlist_mtime: float, cache_file: str) -> Optional[BloomFilter]:
+        """
+        Loads the Bloom Filter saved in `cache_file`, when it is newer than the word list file
+
+        Parameters:
+        wordlist_mtime (float): Last modification time of the file containing a words list
+        cache_file (str): The name or absolute path of the file containing the saved Bloom Filter
+
+        Returns:
+        Optional[BloomFilter]: The saved Bloom Filter, or None when it is missing, outdated or incompatible
+        """
+        try:
+            if os.path.getmtime(cache_file) < wordlist_mtime:
+                return None
+            return BloomFilter.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
     @classmethod
-    def _create_word_list(cls, wordlist_file: str) -> List[str]:
+    def _create_word_list(cls, wordlist_file: str, encoding: Optional[str] = None) -> List[str]:
         """
         This function return a list of raw strings obtained for each line in a file
 
+        The file is read at once and split in lines, and then each line is decoded,
+        so the words are hashed the same way as the (decoded) words to be checked
+
         Parameters:
         wordlist_file (str): The name or absolute path of the file containing a words list
+        encoding (Optional[str]): Encoding of the file. When None, the file is decoded as UTF-8 if it is
+            valid UTF-8, or as latin-1 otherwise (latin-1 decodes any file, so it is only the fallback)
 
         Returns:
         List[str]: List of words obtained from the file
         """
-        with open(wordlist_file, "r") as words_file:
-            return [w.replace("\n", "") for w in words_file.readlines()]
+        with open(wordlist_file, "rb") as words_file:
+            data = words_file.read()
+        if encoding is None:
+            try:
+                data.decode("utf-8")
+                encoding = "utf-8"
+            except UnicodeDecodeError:
+                encoding = "latin-1"
+        return list(map(bytes.decode, data.splitlines(), repeat(encoding)))
 
     @classmethod
     def _create_bloom_filter_with_wordlist(cls, wordlist: List[str], fp_prob: float) -> BloomFilter:
@@ -87,8 +200,6 @@ class SpellChecker():
         """
         bloomF = BloomFilter(num_of_itens=len(
             wordlist), false_pos_prob=fp_prob)
-
-        for w in wordlist:
-            bloomF.add(w)
+        bloomF.add_many(wordlist)
 
         return bloomF
@@ -1,11 +1,109 @@
 import math
-import mmh3
-from bitarray import bitarray
+import numpy as np
+import os
+import tempfile
+import xxhash
+from numba import get_num_threads, njit, prange
+from typing import Iterable, Optional, Tuple, Union
+
+
+# ln(2) and ln(2)^2, used to calculate the optimal size and hash count of the filter
+_LN2 = math.log(2)
+_LN2_SQ = _LN2 * _LN2
+
+# Bits of a single block of the filter: 8 `uint64` words, i.e. one 64 bytes cache line
+_BLOCK_BITS = 512
+_BLOCK_WORDS = _BLOCK_BITS // 64
+
+# Minimum number of items added by each thread of `_bf_add_many`
+_MIN_ITEMS_PER_THREAD = 16384
+
+# Version of the layout and hashing scheme of the files written by `BloomFilter.save`
+_FILE_VERSION = 3
+
+
+def _umask() -> int:
+    """
+    Returns the file mode creation mask of the process (it can only be read by setting it)
+    """
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+@njit(cache=True)
+def _block_bit(h2: int, i: int) -> int:
+    """
+    Derives the index (inside its block) of the i-th bit of an item from its base hash `h2`,
+    as `h2 + i * delta` (Kirsch-Mitzenmacher double hashing), where the odd `delta` comes
+    from the upper bits of `h2`, so the bits of an item never collide (JIT compiled by Numba)
+    """
+    return (h2 + i * ((h2 >> 9) | 1)) & (_BLOCK_BITS - 1)
+
+
+@njit(cache=True)
+def _bf_add(blocks: np.ndarray, h1: int, h2: int, k: int, block_mask: int):
+    """
+    Sets the `k` bits derived from the base hashes `h1` and `h2` in `blocks` (JIT compiled by Numba)
+    """
+    block = blocks[h1 & block_mask]
+    for i in range(k):
+        bit = _block_bit(h2, i)
+        block[bit >> 6] |= np.uint64(1) << np.uint64(bit & 63)
+
+
+@njit(cache=True)
+def _bf_check(blocks: np.ndarray, h1: int, h2: int, k: int, block_mask: int) -> bool:
+    """
+    Checks whether all the `k` bits derived from the base hashes `h1` and `h2` are set in `blocks` (JIT compiled by Numba)
+
+    All the `k` bits are always tested and folded with an AND, instead of returning at the first unset bit:
+    they all live in the same cache line, so this is cheaper than `k` unpredictable branches
+    """
+    block = blocks[h1 & block_mask]
+    found = np.uint64(1)
+    for i in range(k):
+        bit = _block_bit(h2, i)
+        found &= block[bit >> 6] >> np.uint64(bit & 63)
+    return (found & np.uint64(1)) != 0
+
+
+@njit(parallel=True, cache=True)
+def _bf_add_many(blocks: np.ndarray, h1s: np.ndarray, h2s: np.ndarray, k: int, block_mask: int, n_chunks: int):
+    """
+    Sets the `k` bits derived from every pair of base hashes in `h1s` and `h2s` in `blocks`,
+    splitting the items in `n_chunks` chunks added in parallel (JIT compiled by Numba)
+
+    Every chunk is added into its own copy of the blocks, which are OR-ed into `blocks` at the end:
+    concurrent `|=` on a shared word could lose bits, since the read-modify-write is not atomic
+    """
+    n = len(h1s)
+    chunk_size = (n + n_chunks - 1) // n_chunks
+    partials = np.zeros((n_chunks,) + blocks.shape, dtype=np.uint64)
+    for c in prange(n_chunks):
+        for j in range(c * chunk_size, min(n, (c + 1) * chunk_size)):
+            _bf_add(partials[c], h1s[j], h2s[j], k, block_mask)
+    for b in prange(len(blocks)):
+        for c in range(n_chunks):
+            blocks[b] |= partials[c, b]
+
+
+@njit(parallel=True, cache=True)
+def _bf_check_many(blocks: np.ndarray, h1s: np.ndarray, h2s: np.ndarray, k: int, block_mask: int) -> np.ndarray:
+    """
+    Checks, for every pair of base hashes in `h1s` and `h2s`, whether all the `k` bits derived
+    from it are set in `blocks`, in parallel (JIT compiled by Numba)
+    """
+    found = np.empty(len(h1s), dtype=np.bool_)
+    for j in prange(len(h1s)):
+        found[j] = _bf_check(blocks, h1s[j], h2s[j], k, block_mask)
+    return found
+
 
 class BloomFilter():
     def __init__(self, num_of_itens: int, false_pos_prob: float):
         """
-        Instantiates a Bloom Filter by using Mumur 3 (mmh3) library to calculate hashes
+        Instantiates a Bloom Filter by using xxHash (XXH3) library to calculate hashes
 
         Parameters:
         num_of_itens (int): Number of itens that may be stored in the filter
@@ -16,8 +114,15 @@ class BloomFilter():
         num_of_itens (int): Number of itens that may be stored in the filter
         false_pos_prob (float): A decimal representing the false positive probability.
         size (int): The size of the bloom filter based on the number of items and false positive probability.
+            Always a power of two and a multiple of the block size (512 bits)
         hash_count (int): The number of hash functions to be used.
-        bit_array (bitarray): The array of bits
+        block_mask (int): Bit mask (`number of blocks - 1`) used to turn a hash into the index of a block
+        blocks (np.ndarray): The array of bits, split into blocks of 8 64 bits (`uint64`) words
+
+        Notes:
+        This is a blocked Bloom filter: the first base hash of an item selects one block
+        and all its `hash_count` bits are set inside that block. A block fits in a single cache line,
+        so `add` and `check` touch one cache line instead of `hash_count` random ones
         """
 
         self.num_of_itens = num_of_itens
@@ -27,31 +132,52 @@ class BloomFilter():
         self.hash_count = self._calculate_hash_functions_count(
             self.size, self.num_of_itens)
 
-        self.bit_array = bitarray(self.size)
-        self.bit_array.setall(0)
+        num_of_blocks = self.size // _BLOCK_BITS
+        self.block_mask = num_of_blocks - 1
+        self.blocks = np.zeros((num_of_blocks, _BLOCK_WORDS), dtype=np.uint64)
 
-    def add(self, item: str):
+    def add(self, item: Union[str, bytes]):
         """
         'Adds' an item to the Bloom Filter by generating `self.hash_counts` hashed numbers
-        from the `item` content and setting the respective index of the `bit_array` as 1
+        from the `item` content and setting the respective bit of `blocks` as 1
         This process uses multiple independent hash functions to increase the accuracy of the Bloom filter 
         and reduce the chance of false positives.
 
         Parameters:
-        item (str): String to be hashed and "added" to the Bloom filter
+        item (Union[str, bytes]): String (or its UTF-8 encoded bytes) to be hashed and "added" to the Bloom filter
+
+        Raises:
+        ValueError: When the Bloom Filter is read-only (see `BloomFilter.load`)
+        """
+        self._check_writeable()
+        h1, h2 = self._base_hash(item)
+        _bf_add(self.blocks, h1, h2, self.hash_count, self.block_mask)
+
+    def add_many(self, items: Iterable[Union[str, bytes]]):
         """
-        for i in range(self.hash_count):
-            hsh = mmh3.hash(item.lower(), i) % self.size
-            self.bit_array[hsh] = True
+        'Adds' all the `items` to the Bloom Filter at once.
+        The base hashes of all the items are computed as NumPy arrays and their bits are set
+        by a single JIT compiled call, split across threads, instead of one `add` call per item
 
-    def check(self, item: str) -> bool:
+        Parameters:
+        items (Iterable[Union[str, bytes]]): Strings (or their UTF-8 encoded bytes) to be hashed and "added" to the Bloom filter
+
+        Raises:
+        ValueError: When the Bloom Filter is read-only (see `BloomFilter.load`)
+        """
+        self._check_writeable()
+        h1s, h2s = self._base_hashes(items)
+        n_chunks = max(1, min(get_num_threads(), len(h1s) // _MIN_ITEMS_PER_THREAD))
+        _bf_add_many(self.blocks, h1s, h2s, self.hash_count, self.block_mask, n_chunks)
+
+    def check(self, item: Union[str, bytes]) -> bool:
         """
         Check whether the provided `item` string possibly exists in the bloom filter.
-        This is done by hashing the 'item' using Mumur 3, 
-        and verifying that all generated hashes exists in the Bloom Filter 'bit_array'
+        This is done by hashing the 'item' using xxHash (XXH3), 
+        and verifying that all generated hashes exists in the Bloom Filter `blocks`
         
         Parameters:
-        item (str): The string to be checked for existence in Bloom Filter
+        item (Union[str, bytes]): The string (or its UTF-8 encoded bytes) to be checked for existence in Bloom Filter
 
         Returns:
         bool: 
@@ -64,11 +190,158 @@ class BloomFilter():
         However, it will NEVER return a false negative
         (which means that if it indicates that an item doesn't exist, it really doesn't exist)
         """
-        for i in range(self.hash_count):
-            hsh = (mmh3.hash(item.lower(), i)) % self.size
-            if self.bit_array[hsh] == False:
-                return False
-        return True
+        h1, h2 = self._base_hash(item)
+        return _bf_check(self.blocks, h1, h2, self.hash_count, self.block_mask)
+
+    def check_many(self, items: Iterable[Union[str, bytes]]) -> np.ndarray:
+        """
+        Checks whether each one of the `items` possibly exists in the bloom filter (see `check`), at once.
+        The base hashes of all the items are computed as NumPy arrays and all the bits are tested
+        by a single JIT compiled call, instead of one `check` call per item
+
+        Parameters:
+        items (Iterable[Union[str, bytes]]): The strings (or their UTF-8 encoded bytes) to be checked
+
+        Returns:
+        np.ndarray: Array of `bool`, one per item, with the result `check` would return for it
+        """
+        h1s, h2s = self._base_hashes(items)
+        return _bf_check_many(self.blocks, h1s, h2s, self.hash_count, self.block_mask)
+
+    def save(self, file: str):
+        """
+        Saves the Bloom Filter to `file` in NumPy `.npy` format, so it can be loaded
+        again with `BloomFilter.load` instead of being rebuilt
+
+        The file holds the `blocks` preceded by one header block, which stores
+        `num_of_itens`, `false_pos_prob`, `hash_count` and the file format version
+
+        It is written to a temporary file that then replaces `file`, so readers never see
+        a partially written file, and filters already loaded (memory-mapped) from the previous
+        `file` keep reading its old contents
+
+        Parameters:
+        file (str): Name or path of the file to be written
+        """
+        header = np.zeros((1, _BLOCK_WORDS), dtype=np.uint64)
+        header[0, 0] = self.num_of_itens
+        header[0, 1] = np.float64(self.false_pos_prob).view(np.uint64)
+        header[0, 2] = self.hash_count
+        header[0, 3] = _FILE_VERSION
+        with tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(os.path.abspath(file)), suffix=".tmp", delete=False) as bf_file:
+            try:
+                np.save(bf_file, np.concatenate((header, self.blocks)))
+                # NamedTemporaryFile creates it as 0600: give it the mode `open` would have given
+                os.chmod(bf_file.name, 0o666 & ~_umask())
+            except BaseException:
+                bf_file.close()
+                os.unlink(bf_file.name)
+                raise
+        os.replace(bf_file.name, file)
+
+    @classmethod
+    def load(cls, file: str, mmap_mode: Optional[str] = "r") -> "BloomFilter":
+        """
+        Loads a Bloom Filter previously written by `BloomFilter.save`
+
+        Parameters:
+        file (str): Name or path of the file to be loaded
+        mmap_mode (Optional[str]): Memory-map mode passed to `np.load`.
+            With the default "r", the blocks are read straight from the OS page cache
+            and the returned filter can be checked but not added to
+
+        Returns:
+        BloomFilter: The loaded Bloom Filter
+
+        Raises:
+        ValueError: When the file was not written by a compatible version of `BloomFilter`
+        """
+        data = np.load(file, mmap_mode=mmap_mode)
+        if data.ndim != 2 or data.shape[1] != _BLOCK_WORDS or data.shape[0] < 2 \
+                or (data.shape[0] - 1) & (data.shape[0] - 2) or data[0, 3] != _FILE_VERSION:
+            raise ValueError(f"'{file}' is not a compatible Bloom Filter file")
+
+        bloom_filter = cls.__new__(cls)
+        bloom_filter.num_of_itens = int(data[0, 0])
+        bloom_filter.false_pos_prob = float(data[0, 1:2].view(np.float64)[0])
+        bloom_filter.hash_count = int(data[0, 2])
+        bloom_filter.blocks = np.asarray(data[1:])
+        bloom_filter.size = len(bloom_filter.blocks) * _BLOCK_BITS
+        bloom_filter.block_mask = len(bloom_filter.blocks) - 1
+        return bloom_filter
+
+    def _check_writeable(self):
+        """
+        Raises a ValueError when the `blocks` of this Bloom Filter can't be modified,
+        which is the case of the filters loaded memory-mapped in read-only mode by `BloomFilter.load`
+        """
+        if not self.blocks.flags.writeable:
+            raise ValueError(
+                "This Bloom Filter is read-only: it was loaded memory-mapped from a file. "
+                "Load it with `BloomFilter.load(file, mmap_mode=None)` to add items to it")
+
+    @classmethod
+    def _normalize(cls, item: Union[str, bytes]) -> bytes:
+        """
+        Lowercases `item` and encodes it to UTF-8, so the hashing is case insensitive
+        and a string and its UTF-8 encoded bytes are hashed the same way
+
+        ASCII `bytes` are lowercased directly, which is equivalent and skips the decoding
+
+        Parameters:
+        item (Union[str, bytes]): String (or its UTF-8 encoded bytes) to be normalized
+
+        Returns:
+        bytes: The lowercased UTF-8 encoded item
+        """
+        if isinstance(item, str):
+            return item.lower().encode("utf-8")
+        if item.isascii():
+            return item.lower()
+        return item.decode("utf-8").lower().encode("utf-8")
+
+    @classmethod
+    def _base_hash(cls, item: Union[str, bytes]) -> Tuple[int, int]:
+        """
+        Computes the two base hashes of `item` (the halves of a single 128 bits XXH3 hash),
+        from which all the `hash_count` indexes of the item are derived
+
+        The item is lowercased and encoded to UTF-8 first (see `_normalize`)
+
+        Parameters:
+        item (Union[str, bytes]): String (or its UTF-8 encoded bytes) to be hashed
+
+        Returns:
+        Tuple[int, int]: The `h1` and `h2` hashes, truncated to 32 bits
+        """
+        digest = xxhash.xxh3_128_intdigest(cls._normalize(item))
+        return (digest >> 64) & 0xffffffff, digest & 0xffffffff
+
+    @classmethod
+    def _base_hashes(cls, items: Iterable[Union[str, bytes]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the two base hashes (see `_base_hash`) of every item
+
+        The hashing is mapped straight over the C function `xxhash.xxh3_128_digest`,
+        and the big endian digests are joined into a single contiguous buffer read by NumPy.
+        When all the items are strings, they are also normalized by mapping the C methods
+        `str.lower` and `str.encode`, instead of calling `_normalize` for each one
+
+        Parameters:
+        items (Iterable[Union[str, bytes]]): Strings (or their UTF-8 encoded bytes) to be hashed
+
+        Returns:
+        Tuple[np.ndarray, np.ndarray]: The `h1` and `h2` hashes, one of each per item
+        """
+        items = list(items)
+        if set(map(type, items)) <= {str}:
+            normalized = map(str.encode, map(str.lower, items))
+        else:
+            normalized = map(cls._normalize, items)
+        hashes = np.frombuffer(b"".join(map(xxhash.xxh3_128_digest, normalized)), dtype=">u8")
+        hashes = (hashes & np.uint64(0xffffffff)).astype(np.int64).reshape(-1, 2)
+        return hashes[:, 0], hashes[:, 1]
 
     @classmethod
     def _calculate_size(cls, n: int, p: float):
@@ -81,6 +354,10 @@ class BloomFilter():
 
         Returns:
         - int: The size of the Bloom filter, calculated based on the number of items and false positive probability
+            and rounded up to the next power of two (and to at least one 512 bits block)
+
+        Raises:
+        - ValueError: When `p` is not a decimal number between 0 and 1 (exclusive)
 
         Note:
         A Bloom filter is a probabilistic data structure that uses multiple hash functions
@@ -92,9 +369,14 @@ class BloomFilter():
         a false positive for an item that is not in the set. The size of the Bloom filter `m` is
         determined by the number of itens `n` and the false positive probability `p`, and
         it affects the probability of false positives and the memory usage of the Bloom filter.
+
+        Rounding `m` up to a power of two lets a hash be mapped into the filter with a single
+        bitwise AND (`hash & (m - 1)`) instead of a modulo, which also keeps the index unsigned.
         """
-        m = -((n * math.log(p)) / (math.log(2) ** 2))
-        return int(m)
+        if not 0 < p < 1:
+            raise ValueError(f"The false positive probability should be between 0 and 1, got {p}")
+        m = -((n * math.log(p)) / _LN2_SQ)
+        return max(1 << (int(m) - 1).bit_length(), _BLOCK_BITS)
 
     @classmethod
     def _calculate_hash_functions_count(cls, m: int, n: int) -> int:
@@ -108,5 +390,5 @@ class BloomFilter():
         Returns:
         int: Number of optimal count of hash functions
         """
-        k = (m / n) * math.log(2)
+        k = (m / n) * _LN2
         return int(k)
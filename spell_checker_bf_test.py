@@ -0,0 +1,108 @@
+import os
+import numpy as np
+import pytest
+from spell_checker import SpellChecker
+from spell_checker_bf import BloomFilter
+
+WORDS = ["apple", "banana", "café", b"cherry"]
+
+
+def _filter_with_words(words=WORDS, fp_prob=0.01):
+    bloom_filter = BloomFilter(len(words), fp_prob)
+    bloom_filter.add_many(words)
+    return bloom_filter
+
+
+def test_save_load_round_trip(tmp_path):
+    bf_file = str(tmp_path / "words.bf.npy")
+    bloom_filter = _filter_with_words()
+    bloom_filter.save(bf_file)
+
+    loaded = BloomFilter.load(bf_file)
+
+    assert (loaded.num_of_itens, loaded.false_pos_prob, loaded.hash_count, loaded.size) == \
+        (bloom_filter.num_of_itens, bloom_filter.false_pos_prob, bloom_filter.hash_count, bloom_filter.size)
+    assert np.array_equal(loaded.blocks, bloom_filter.blocks)
+    assert all(loaded.check_many(WORDS))
+
+
+def test_save_uses_default_file_mode(tmp_path):
+    bf_file = str(tmp_path / "words.bf.npy")
+    _filter_with_words().save(bf_file)
+
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(bf_file).st_mode & 0o777 == 0o666 & ~umask
+    assert os.listdir(tmp_path) == ["words.bf.npy"]
+
+
+def test_save_replaces_file_loaded_by_other_filters(tmp_path):
+    bf_file = str(tmp_path / "words.bf.npy")
+    _filter_with_words(["word%d" % i for i in range(10000)]).save(bf_file)
+    loaded = BloomFilter.load(bf_file)
+
+    # A smaller filter saved over a memory-mapped one must not truncate the mapped file
+    _filter_with_words().save(bf_file)
+
+    assert loaded.check("word9999")
+    assert all(BloomFilter.load(bf_file).check_many(WORDS))
+
+
+def test_loaded_filter_is_read_only(tmp_path):
+    bf_file = str(tmp_path / "words.bf.npy")
+    _filter_with_words().save(bf_file)
+    loaded = BloomFilter.load(bf_file)
+
+    with pytest.raises(ValueError, match="read-only"):
+        loaded.add("durian")
+    with pytest.raises(ValueError, match="read-only"):
+        loaded.add_many(["durian"])
+
+    writeable = BloomFilter.load(bf_file, mmap_mode=None)
+    writeable.add("durian")
+    assert writeable.check("durian")
+
+
+@pytest.mark.parametrize("data", [
+    np.zeros((0, 8), dtype=np.uint64),
+    np.zeros((1, 8), dtype=np.uint64),
+    np.zeros((4, 8), dtype=np.uint64),
+    np.zeros((3, 4), dtype=np.uint64),
+    np.zeros(16, dtype=np.uint64),
+])
+def test_load_rejects_malformed_files(tmp_path, data):
+    bf_file = str(tmp_path / "words.bf.npy")
+    np.save(bf_file, data)
+
+    with pytest.raises(ValueError):
+        BloomFilter.load(bf_file)
+
+
+def _wordlist(tmp_path, words=("apple", "banana", "café")):
+    wordlist_file = tmp_path / "words.txt"
+    wordlist_file.write_text("\n".join(words) + "\n", encoding="utf-8")
+    return str(wordlist_file)
+
+
+def test_spell_checker_rebuilds_incompatible_cache(tmp_path):
+    wordlist_file = _wordlist(tmp_path)
+    cache_file = f"{wordlist_file}.auto.0.05.bf.npy"
+    np.save(cache_file, np.zeros((0, 8), dtype=np.uint64))
+
+    spell_chk = SpellChecker(wordlist_file=wordlist_file, fp_prob=0.05)
+
+    assert spell_chk.check("café")
+    assert BloomFilter.load(cache_file).check("café")
+
+
+def test_spell_checker_rebuilds_stale_cache(tmp_path):
+    wordlist_file = _wordlist(tmp_path)
+    cache_file = f"{wordlist_file}.auto.0.05.bf.npy"
+    _filter_with_words(["stale"]).save(cache_file)
+    cache_mtime = os.path.getmtime(cache_file)
+    os.utime(wordlist_file, (cache_mtime + 10, cache_mtime + 10))
+
+    spell_chk = SpellChecker(wordlist_file=wordlist_file, fp_prob=0.05)
+
+    assert spell_chk.check("apple")
+    assert BloomFilter.load(cache_file).check("apple")
@@ -0,0 +1,86 @@
+import io
+import os
+import shutil
+import sys
+from spell_checker import SpellChecker
+
+WORDLIST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wordlist.txt")
+WORDLIST_ENCODING = "latin-1"
+
+
+def test_wordlist_has_no_false_negatives(tmp_path):
+    """
+    A Bloom filter must never return a false negative:
+    every word of the bundled (latin-1) word list has to be found by the SpellChecker
+    """
+    wordlist_file = shutil.copy(WORDLIST_FILE, tmp_path)
+    spell_chk = SpellChecker(wordlist_file=wordlist_file, fp_prob=0.05)
+    with open(WORDLIST_FILE, encoding=WORDLIST_ENCODING) as words_file:
+        words = words_file.read().splitlines()
+
+    missing = [w for w in words if not spell_chk.check(w)]
+    assert not missing, f"{len(missing)} words of '{WORDLIST_FILE}' were not found, e.g. {missing[:5]}"
+    assert all(spell_chk.check_many(words))
+
+
+def test_utf8_wordlist_has_no_false_negatives(tmp_path):
+    wordlist_file = tmp_path / "utf8.txt"
+    wordlist_file.write_text("café\nnaïve\nÉCLAIR\nhello\n", encoding="utf-8")
+
+    spell_chk = SpellChecker(wordlist_file=str(wordlist_file), fp_prob=0.01)
+
+    for word in ["café", "naïve", "ÉCLAIR", "éclair", "Hello"]:
+        assert spell_chk.check(word), word
+
+
+def test_explicit_encoding(tmp_path):
+    wordlist_file = tmp_path / "cp1252.txt"
+    wordlist_file.write_text("café\n€uro\n", encoding="cp1252")
+
+    spell_chk = SpellChecker(wordlist_file=str(wordlist_file), fp_prob=0.01, encoding="cp1252")
+
+    assert spell_chk.check("café")
+    assert spell_chk.check("€uro")
+
+
+def test_piped_stdin_is_checked_in_batch(tmp_path, monkeypatch, capsys):
+    wordlist_file = tmp_path / "words.txt"
+    wordlist_file.write_text("apple\ncafé\n", encoding="utf-8")
+    spell_chk = SpellChecker(wordlist_file=str(wordlist_file), fp_prob=0.001)
+    stdin = io.StringIO("Apple\n\n   \nzzzzqx\ncafé")
+    stdin.isatty = lambda: False
+    monkeypatch.setattr(sys, "stdin", stdin)
+
+    spell_chk.start_sc()
+
+    assert capsys.readouterr().out == (
+        "The word 'Apple' probably exist in the dictionary!\n"
+        "The word 'zzzzqx' probably DOES NOT exist in the dictionary!\n"
+        "The word 'café' probably exist in the dictionary!\n")
+
+
+def test_check_many_matches_check(tmp_path):
+    wordlist_file = shutil.copy(WORDLIST_FILE, tmp_path)
+    spell_chk = SpellChecker(wordlist_file=wordlist_file, fp_prob=0.05)
+    words = ["hello", "HELLO", "Ardèche", "zzzzqx", "qwertyuiop", "", "naïve", "Straße"]
+
+    for items in (words, [w.encode("utf-8") for w in words]):
+        assert spell_chk.check_many(items) == [spell_chk.check(w) for w in items]
+
+
+def test_instances_share_filter_until_wordlist_changes(tmp_path, monkeypatch):
+    wordlist_file = tmp_path / "words.txt"
+    wordlist_file.write_text("apple\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    first = SpellChecker(wordlist_file="words.txt", fp_prob=0.01)
+    second = SpellChecker(wordlist_file=str(wordlist_file), fp_prob=0.01)
+    assert first._bloom_filter is second._bloom_filter
+
+    wordlist_file.write_text("apple\nbanana\n", encoding="utf-8")
+    mtime = os.path.getmtime(wordlist_file) + 10
+    os.utime(wordlist_file, (mtime, mtime))
+
+    rebuilt = SpellChecker(wordlist_file="words.txt", fp_prob=0.01)
+    assert rebuilt._bloom_filter is not first._bloom_filter
+    assert rebuilt.check("banana")